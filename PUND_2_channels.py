@@ -45,18 +45,21 @@ def _bottom_smu_trigger_model(smu):
     smu.device.write('TRIG:BLOC:BRAN:ALW 9, 0')
 
 
-def mesure_PUND(smu_top, smu_bottom, params):
-    smu_top.setup_sense_subsystem(compl=params['range_top'], range=params['range_top'], int_time=0, counts=1)
-    smu_top.setup_source_subsystem()
-
-    smu_bottom.setup_sense_subsystem(compl=params['range_bottom'], range=params['range_bottom'], int_time=0, counts=1)
-    smu_bottom.setup_source_subsystem()
-
-    try:
-        _ = params['growth_rate']
-        waveform = create_waveform(params, by_rate=True)
-    except KeyError:
-        waveform = create_waveform(params, by_rate=False)
+def mesure_PUND(smu_top, smu_bottom, params, waveform=None, configure=True):
+    if configure:
+        smu_top.setup_sense_subsystem(compl=params['range_top'], range=params['range_top'], int_time=0, counts=1)
+        smu_top.setup_source_subsystem()
+
+        smu_bottom.setup_sense_subsystem(compl=params['range_bottom'], range=params['range_bottom'], int_time=0,
+                                         counts=1)
+        smu_bottom.setup_source_subsystem()
+
+    if waveform is None:
+        try:
+            _ = params['growth_rate']
+            waveform = create_waveform(params, by_rate=True)
+        except KeyError:
+            waveform = create_waveform(params, by_rate=False)
 
     smu_top.setup_voltage_list_sweep(waveform, params['n_cycles'])
     smu_bottom.setup_voltage_list_sweep([0], params['n_cycles'])
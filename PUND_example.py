@@ -1,4 +1,4 @@
-from PUND_waveform import create_waveform
+from PUND_waveform import create_waveform, create_adaptive_waveform
 from SMU_device import SMUDevice
 from plot_fig import *
 from cycling import cycle
@@ -10,6 +10,7 @@ time.sleep(0)
 device = 'SMU1'
 
 ifcycle = False
+adaptive = False
 terminal = 'front'
 
 area = 25 ** 2 * 1e-8
@@ -30,6 +31,9 @@ n_cycles - number of PUND cycles
 
 Time required for a single measurement is approximately 0.5 ms. It is the limit for this SMU. The only way to control
 rise/hold/space time is to change the number of measurements.
+
+With adaptive = True flat segments are sampled every 'sparse_dt' points (default 5) and the dropped points are replaced
+by source delays, ramps and the first 'settle' points (default 2) after each voltage change stay dense.
 """
 
 params = {
@@ -52,8 +56,12 @@ with SMUDevice(device) as smu:
             # cycle(smu, 10, params['Vf'], params['Vs'])
         smu.setup_sense_subsystem(compl=1e-4, range=1e-4, int_time=0, counts=1)
         smu.setup_source_subsystem()
-        waveform = create_waveform(params, by_rate=True)
-        smu.setup_voltage_list_sweep(waveform, params['n_cycles'])
+        if adaptive:
+            waveform, delays = create_adaptive_waveform(params, by_rate=True)
+            smu.setup_voltage_list_sweep_with_delays(waveform, delays, params['n_cycles'])
+        else:
+            waveform = create_waveform(params, by_rate=True)
+            smu.setup_voltage_list_sweep(waveform, params['n_cycles'])
 
         smu.write_command('INIT')
         smu.wait()
@@ -0,0 +1,152 @@
+import itertools
+import threading
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from PUND_waveform import create_waveforms, sparsify_waveform
+from PUND_2_channels import mesure_PUND
+
+
+def create_sweep(params, grid):
+    """
+        All combinations of the grid values on top of the base params.
+        :param params: dict (base PUND params, see PUND_example.py)
+        :param grid: dict (parameter name -> list of values, e.g. {'Vf': [-2, -3], 'growth_rate': [5, 10]})
+        :return: list (of params dicts, one per run)
+    """
+    keys = list(grid.keys())
+    return [dict(params, **dict(zip(keys, values))) for values in itertools.product(*grid.values())]
+
+
+def order_runs(runs):
+    """
+        Order the runs so that the ones with the same range, compliance and waveform mode go back to back and the
+        SMUs are reconfigured only when these change. The grid order is kept inside every group.
+        :param runs: list (of params dicts)
+        :return: list (of run indices)
+    """
+    groups = {}
+    for i, params in enumerate(runs):
+        groups.setdefault(_configuration_key(params), []).append(i)
+    return [i for group in groups.values() for i in group]
+
+
+def run_sweep(smus, params, grid, results=None):
+    """
+        Measure PUND for every combination of the grid values. Waveforms are generated in one batch, the runs are
+        distributed between the SMUs (each of them is measured in its own thread) and collected into one dataset.
+        If a run fails, the other SMUs finish their current run and stop, then the error is raised.
+        Pulses are defined by 'growth_rate' if the params contain it, otherwise by 'rise' (a 'rise' grid together
+        with 'growth_rate' is rejected).
+        :param smus: list (of SMUDevice for single channel measurements or (smu_top, smu_bottom) tuples)
+        :param params: dict (base PUND params)
+        :param grid: dict (parameter name -> list of values)
+        :param results: dict (optional, filled with run index -> record as the runs finish, keeps partial results
+                        if a run fails)
+        :return: list (of {'index', 'smu', 'params', 'data'} dicts in the grid order)
+    """
+    if len(smus) == 0:
+        raise ValueError('At least one SMU is required for a sweep')
+    empty = [key for key, values in grid.items() if len(values) == 0]
+    if empty:
+        raise ValueError(f'Empty grid values for {", ".join(empty)}')
+
+    by_rate = 'growth_rate' in params or 'growth_rate' in grid
+    if by_rate and 'rise' in grid:
+        raise ValueError("'rise' can not be swept together with 'growth_rate', remove one of them")
+
+    runs = create_sweep(params, grid)
+    if any(isinstance(smu, tuple) for smu in smus) and any(run.get('adaptive', False) for run in runs):
+        raise ValueError('Adaptive waveforms are not supported for (smu_top, smu_bottom) pairs')
+
+    waveforms = create_waveforms(runs, by_rate=by_rate)
+    chunks = np.array_split(order_runs(runs), len(smus))
+    if results is None:
+        results = {}
+
+    failed = threading.Event()
+    with ThreadPoolExecutor(max_workers=len(smus)) as executor:
+        futures = [executor.submit(_run_chunk, n, smu, runs, waveforms, chunk.tolist(), results, failed)
+                   for n, (smu, chunk) in enumerate(zip(smus, chunks))]
+        for future in futures:
+            future.result()
+
+    return [results[i] for i in range(len(runs))]
+
+
+def _run_chunk(n, smu, runs, waveforms, indices, results, failed):
+    configuration = None
+    for i in indices:
+        if failed.is_set():
+            return
+        key = _configuration_key(runs[i])
+        try:
+            data = _measure(smu, runs[i], waveforms[i], configure=key != configuration)
+        except BaseException:
+            failed.set()
+            raise
+        results[i] = {'index': i, 'smu': n, 'params': runs[i], 'data': data}
+        configuration = key
+
+
+def _measure(smu, params, waveform, configure=True):
+    if isinstance(smu, tuple):
+        smu_top, smu_bottom = smu
+        return mesure_PUND(smu_top, smu_bottom, params, waveform=waveform, configure=configure)
+
+    if configure:
+        smu.setup_sense_subsystem(compl=params.get('compl', 1e-4), range=params.get('range', 1e-4), int_time=0,
+                                  counts=1)
+        smu.setup_source_subsystem()
+
+    if params.get('adaptive', False):
+        waveform, delays = sparsify_waveform(waveform, params)
+        smu.setup_voltage_list_sweep_with_delays(waveform, delays, params['n_cycles'])
+    else:
+        smu.setup_voltage_list_sweep(waveform, params['n_cycles'])
+
+    smu.write_command('INIT')
+    smu.wait()
+    smu.check_for_errors()
+    return smu.get_traces()
+
+
+def _configuration_key(params):
+    return tuple(params.get(key) for key in ['range', 'compl', 'range_top', 'range_bottom', 'adaptive'])
+
+
+if __name__ == '__main__':
+    import os
+    import datetime
+    from SMU_device import SMUDevice
+    from plot_fig import save_data
+
+    params = {
+        'Vf': -2.5,
+        'Vs': 2.5,
+        'hold': 2,
+        'space': 15,
+        'n_cycles': 2,
+        'growth_rate': 10,
+        'range': 1e-4,
+        'compl': 1e-4,
+    }
+    grid = {
+        'Vf': [-2, -2.5, -3],
+        'growth_rate': [5, 10, 20],
+        'range': [1e-5, 1e-4],
+    }
+
+    smus = []
+    results = {}
+    now = datetime.datetime.now()
+    try:
+        for name in ['SMU1', 'SMU2']:
+            smus.append(SMUDevice(name))
+            smus[-1].set_terminal('front')
+
+        run_sweep(smus, params, grid, results=results)
+    finally:
+        for smu in smus:
+            smu.close()
+        save_data([results[i] for i in sorted(results)], os.path.join(os.getcwd(), 'sweeps'),
+                  f'{now.strftime("%m-%d-%y time-%H %M")}')
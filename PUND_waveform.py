@@ -1,6 +1,8 @@
 import numpy as np
 import matplotlib.pyplot as plt
 
+POINT_TIME = 5e-4  # time required for a single measurement, s
+
 # params:
 # Vf - first voltage
 # Vs - second voltage
@@ -42,6 +44,113 @@ def create_pulse(params, voltage):
     return voltage_series.tolist()
 
 
+def create_waveforms(params_list, by_rate=False):
+    """
+        Vectorized create_waveform for a family of params (e.g. a parameter sweep). All waveforms are evaluated
+        at once on a common time grid and trimmed to their own lengths.
+        :param params_list: list (of params dicts, see create_waveform)
+        :param by_rate: bool (use 'growth_rate' instead of 'rise')
+        :return: list (of waveforms)
+    """
+    for params in params_list:
+        params.update({'dt': 1})
+    voltages = np.array([[params['Vf'], params['Vf'], params['Vs'], params['Vs']] for params in params_list], float)
+    half_space = np.array([int(np.ceil(params['space'] / 2 / params['dt'])) for params in params_list])[:, None]
+    hold = np.array([params['hold'] for params in params_list])[:, None]
+    if by_rate:
+        growth_rate = np.array([params['growth_rate'] for params in params_list])[:, None]
+        rise = np.abs((growth_rate * voltages).astype(int))
+    else:
+        rise = np.repeat(np.array([params['rise'] for params in params_list])[:, None], 4, axis=1)
+
+    pulse_length = 2 * rise + hold
+    pulse_points = np.ceil(pulse_length + 1).astype(int)  # same as np.arange(0, pulse_length + dt, dt)
+    pulse_start = np.cumsum(2 * half_space + pulse_points, axis=1) - half_space - pulse_points
+    lengths = (pulse_start[:, -1] + pulse_points[:, -1] + half_space[:, 0]).astype(int)
+
+    t = np.arange(lengths.max())[None, None, :] - pulse_start[:, :, None]
+    pulse_length = pulse_length[:, :, None]
+    rise = rise[:, :, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shape = np.clip(np.minimum(t, pulse_length - t) / rise, 0, 1)
+    # zero rise is a step (np.interp takes the last of the repeated knots): on at t=0, off at t=pulse_length
+    shape = np.where(rise == 0, (t >= 0) & (t < pulse_length), shape)
+    waveforms = np.sum(voltages[:, :, None] * shape, axis=1)
+    return [waveform[:length].tolist() for waveform, length in zip(waveforms, lengths)]
+
+
+def create_adaptive_waveform(params, by_rate=False):
+    """
+        Same PUND sequence as create_waveform, but flat segments are sampled sparsely. Ramps (which cross the
+        coercive voltage) and the first 'settle' points after every change of the voltage stay dense; every
+        'sparse_dt'-th point is kept elsewhere. Dropped points are replaced by a source delay of the kept point,
+        so the timing is preserved.
+        :param params: dict (create_waveform params plus optional 'sparse_dt', 'settle', 'point_time')
+        :param by_rate: bool (use 'growth_rate' instead of 'rise')
+        :return: (list, list) (voltages and source delays in seconds for every point)
+    """
+    return sparsify_waveform(create_waveform(params, by_rate=by_rate), params)
+
+
+def sparsify_waveform(waveform, params):
+    """
+        Drop points on flat segments of a waveform and replace them by source delays (see create_adaptive_waveform).
+        :param waveform: list (voltages sampled every 'point_time')
+        :param params: dict (optional 'sparse_dt', 'settle', 'point_time')
+        :return: (list, list) (voltages and source delays in seconds for every point)
+    """
+    v = np.array(waveform)
+    sparse_dt = int(params.get('sparse_dt', 5))
+    settle = int(params.get('settle', 2))
+    point_time = params.get('point_time', POINT_TIME)
+    index = np.arange(len(v))
+
+    changed = np.append(True, v[1:] != v[:-1])
+    changes_next = np.append(v[1:] != v[:-1], True)
+    since_change = index - np.maximum.accumulate(np.where(changed, index, 0))
+    dense = changes_next | (since_change <= settle)
+
+    run_start = np.maximum.accumulate(np.where(dense | np.append(True, dense[:-1]), index, 0))
+    keep = dense | ((index - run_start) % sparse_dt == 0)
+
+    kept = index[keep]
+    represented = np.diff(kept, append=len(v))
+    delays = (represented - 1) * point_time
+    return v[kept].tolist(), delays.tolist()
+
+
+def check_waveforms():
+    """
+        Self-check of the vectorized and adaptive waveforms against create_waveform over a grid of params,
+        including zero rise (by_rate with |growth_rate*V| < 1) and a non-integer hold. Sparsified waveforms have to
+        keep the total time and sample the P/U (N/D) pulses identically, as plot_fig takes the time steps of the
+        first half only. Raises AssertionError.
+    """
+    from plot_fig import _time_steps
+
+    params = {'space': 20}
+    for by_rate in [False, True]:
+        family = [dict(params, Vf=vf, Vs=vs, rise=rise, hold=hold, growth_rate=growth_rate)
+                  for vf in [2.5, -0.15, 0] for vs in [-2.5, 0.1] for rise in [0, 3, 2.5]
+                  for hold in [0, 2, 2.5, 7, 20] for growth_rate in [5, 10]]
+        batch = create_waveforms([dict(p) for p in family], by_rate=by_rate)
+        for p, waveform in zip(family, batch):
+            reference = create_waveform(dict(p), by_rate=by_rate)
+            assert len(waveform) == len(reference) and np.allclose(waveform, reference), p
+
+            for sparse_dt in [3, 5]:
+                v, delays = sparsify_waveform(reference, {'sparse_dt': sparse_dt})
+                v, delays = np.array(v), np.array(delays)
+                assert np.isclose(len(v) + delays.sum() / POINT_TIME, len(reference)), p
+                if p['Vf'] * p['Vs'] >= 0:
+                    continue  # plot_fig needs pulses of opposite polarity
+                dt = _time_steps(np.cumsum(delays + POINT_TIME))
+                for logic in [v > 0.025, v < -0.025]:
+                    first, second = np.split(v[logic], 2)
+                    first_dt, second_dt = np.split(dt[logic], 2)
+                    assert np.allclose(first, second) and np.allclose(first_dt, second_dt), p
+
+
 if __name__ == '__main__':
     params = {
         'Vf': 2.5,
@@ -53,4 +162,8 @@ if __name__ == '__main__':
     v = np.array(create_waveform(params))
     t = np.arange(0, len(v) * params['dt'], params['dt'])
     plt.plot(t, v)
+
+    v_adaptive, delays = create_adaptive_waveform(params)
+    t_adaptive = np.cumsum(np.array(delays) / POINT_TIME + params['dt']) - params['dt']
+    plt.plot(t_adaptive, v_adaptive, 'o')
     plt.show()
\ No newline at end of file
@@ -7,6 +7,7 @@ class SMUDevice:
     def __init__(self, instruments_name):
         self.device = None
         self.instr_name = instruments_name
+        self.source_delay = None  # auto delay after *RST
         self.connect(verbose=False)
 
     def __enter__(self):
@@ -87,12 +88,8 @@ class SMUDevice:
         else:
             self.device.write(f'SOUR:VOLT:RANG:AUTO OFF')
 
-        if delay is not None:
-            self.device.write(f'SOUR:VOLT:DEL:AUTO OFF')
-            self.device.write(f'SOUR:VOLT:DEL 0.001')
-            self.device.write(f'SOUR:VOLT:DEL {delay}')
-        else:
-            self.device.write(f'SOUR:VOLT:DEL:AUTO ON')
+        self.source_delay = delay
+        self._set_source_delay(delay)
 
         if readback:
             self.device.write(f'SOUR:VOLT:READ:BACK ON')
@@ -133,6 +130,36 @@ class SMUDevice:
 
         self._define_sweep_trigger_model(n_points, n_times)
 
+    def setup_voltage_list_sweep_with_delays(self, waveform, delays, n_times,
+                                             configuration_list="VoltAdaptiveSweepList"):
+        """
+            set up list sweep with an individual source delay for every point (see create_adaptive_waveform)
+            :param waveform: list (voltages)
+            :param delays: list (source delay in seconds for every voltage)
+            :param n_times: int (number of repetitions)
+            :param configuration_list: str (name of the source configuration list)
+        """
+        if not any(delays):
+            # nothing was dropped, the plain list sweep is uploaded much faster
+            self.setup_voltage_list_sweep(waveform, n_times)
+            return
+
+        # STOR appends to an existing list, so the old one is deleted (if present, otherwise DEL queues an error)
+        if configuration_list in self._configuration_lists():
+            self.device.write(f'SOUR:CONF:LIST:DEL "{configuration_list}"')
+        self.device.write(f'SOUR:CONF:LIST:CRE "{configuration_list}"')
+        self.device.write(f'SOUR:VOLT:DEL:AUTO OFF')
+
+        points = [f':SOUR:VOLT {voltage};:SOUR:VOLT:DEL {delay};:SOUR:CONF:LIST:STOR "{configuration_list}"'
+                  for voltage, delay in zip(waveform, delays)]
+        for i in range(0, len(points), 20):
+            self.device.write(';'.join(points[i:i + 20]))
+
+        # later list sweeps store the current source settings in every point
+        self._set_source_delay(self.source_delay)
+
+        self._define_sweep_trigger_model(len(waveform), n_times, configuration_list)
+
     def check_for_errors(self):
         """
             Check if some errors occurred during the measurements. Raise warning in that case.
@@ -165,6 +192,26 @@ class SMUDevice:
     def close(self):
         self.device.close()
 
+    def _configuration_lists(self):
+        """
+            Names of the source configuration lists, the catalog returns one name per query and then an empty string.
+        """
+        names = []
+        while True:
+            self.device.write('SOUR:CONF:LIST:CAT?')
+            name = self.device.read().strip().strip('"')
+            if not name:
+                return names
+            names.append(name)
+
+    def _set_source_delay(self, delay):
+        if delay is not None:
+            self.device.write(f'SOUR:VOLT:DEL:AUTO OFF')
+            self.device.write(f'SOUR:VOLT:DEL 0.001')
+            self.device.write(f'SOUR:VOLT:DEL {delay}')
+        else:
+            self.device.write(f'SOUR:VOLT:DEL:AUTO ON')
+
     def _define_sweep_trigger_model(self, n_points, n_times, configuration_list="VoltCustomSweepList"):
         self.device.write('TRIG:LOAD "Empty"')
         self.device.write('TRIG:BLOC:BUFF:CLEAR 1')
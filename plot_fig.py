@@ -12,28 +12,32 @@ def plot_average(data, params, area, save=False, path=None, name=None):
     try:
         voltages = np.split(voltage, params['n_cycles'])
         currents = np.split(current, params['n_cycles'])
+        dts = np.split(_time_steps(meas_time), params['n_cycles'])
     except ValueError:
         voltages = []
         currents = []
-    dt = np.mean(np.diff(np.array(data['time'])))
+        dts = []
     c = np.mean(currents, axis=0)
     v = voltages[0]
+    dt = dts[0]
 
     logic = np.where(v > 0.025)
 
     try:
         pv, uv = np.split(v[logic], 2)
         pc, uc = np.split(c[logic], 2)
+        pdt, _ = np.split(dt[logic], 2)
     except ValueError:
         pass
     try:
         logic = np.where(v < -0.025)
         nv, dv = np.split(v[logic], 2)
         nc, dc = np.split(c[logic], 2)
+        ndt, _ = np.split(dt[logic], 2)
     except ValueError:
         pass
 
-    charge = np.append(pc, nc) - np.append(uc, dc)
+    charge = (np.append(pc, nc) - np.append(uc, dc)) * np.append(pdt, ndt)
     v_charge = np.append(pv, nv)
 
     ax = plt.subplot2grid((2, 2), (0, 0), colspan=2, rowspan=1)
@@ -67,7 +71,7 @@ def plot_average(data, params, area, save=False, path=None, name=None):
     ax3.set_xlabel('Voltage, V', fontsize=20, labelpad=10)
     ax3.set_ylabel('Current, $\mu$A', fontsize=20, labelpad=10)
     charge = np.cumsum(charge)
-    ax4.plot(v_charge, charge * 1e6 * dt / area, linewidth=2, color='tomato')
+    ax4.plot(v_charge, charge * 1e6 / area, linewidth=2, color='tomato')
 
     for spine in ['left', 'right', 'top', 'bottom']:
         ax4.spines[spine].set_linewidth(2)
@@ -97,10 +101,11 @@ def plot_fig(data, params, area, save=False, path=None, name=None):
     try:
         voltages = np.split(voltage, params['n_cycles'])
         currents = np.split(current, params['n_cycles'])
+        dts = np.split(_time_steps(meas_time), params['n_cycles'])
     except ValueError:
         voltages = []
         currents = []
-    dt = np.mean(np.diff(np.array(data['time'])))
+        dts = []
 
     v_charge = np.array([])
     charge = np.array([])
@@ -109,9 +114,11 @@ def plot_fig(data, params, area, save=False, path=None, name=None):
 
         logic = np.where(v > 0.025)
         c = currents[i]
+        dt = dts[i]
         try:
             pv, uv = np.split(v[logic], 2)
             pc, uc = np.split(c[logic], 2)
+            pdt, _ = np.split(dt[logic], 2)
         except ValueError:
             break
 
@@ -119,10 +126,11 @@ def plot_fig(data, params, area, save=False, path=None, name=None):
             logic = np.where(v < -0.025)
             nv, dv = np.split(v[logic], 2)
             nc, dc = np.split(c[logic], 2)
+            ndt, _ = np.split(dt[logic], 2)
         except ValueError:
             break
 
-        charge = np.append(charge, np.cumsum(np.append(pc, nc) - np.append(uc, dc)))
+        charge = np.append(charge, np.cumsum((np.append(pc, nc) - np.append(uc, dc)) * np.append(pdt, ndt)))
         v_charge = np.append(v_charge, np.append(pv, nv))
 
     ax = plt.subplot2grid((2, 2), (0, 0), colspan=2, rowspan=1)
@@ -156,7 +164,7 @@ def plot_fig(data, params, area, save=False, path=None, name=None):
     ax3.set_xlabel('Voltage, V', fontsize=20, labelpad=10)
     ax3.set_ylabel('Current, $\mu$A', fontsize=20, labelpad=10)
 
-    ax4.plot(v_charge, charge * 1e6 * dt / area, linewidth=2, color='tomato')
+    ax4.plot(v_charge, charge * 1e6 / area, linewidth=2, color='tomato')
 
     for spine in ['left', 'right', 'top', 'bottom']:
         ax4.spines[spine].set_linewidth(2)
@@ -177,6 +185,17 @@ def plot_fig(data, params, area, save=False, path=None, name=None):
     plt.show()
 
 
+def _time_steps(meas_time):
+    """
+        Time represented by every measurement, i.e. the time elapsed since the previous one (source delays are
+        applied before a measurement). Works for non-uniform sampling (see create_adaptive_waveform).
+    """
+    if len(meas_time) < 2:
+        return np.zeros(len(meas_time))
+    steps = np.diff(meas_time)
+    return np.append(steps[0], steps)
+
+
 def save_data(data, path, name):
     name = name + '.json'
     try: